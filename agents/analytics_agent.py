@@ -1,27 +1,54 @@
 import os
 import json
+import threading
 from pathlib import Path
-from google.analytics.data_v1beta import BetaAnalyticsDataClient
-from google.analytics.data_v1beta.types import (
-    DateRange, Dimension, Metric, RunReportRequest, FilterExpression, Filter
-)
+from utils.deadline import DeadlineExceeded
 
 class AnalyticsAgent: 
-    def __init__(self):
+    def __init__(self, eager: bool = True):
         # Dynamically locate the root directory of the project
         base_dir = Path(__file__).resolve().parent.parent
         self.creds_path = base_dir / "credentials.json"
         
-        if not self.creds_path.exists():
-            # Crucial: Don't crash the whole app, but log it clearly
-            print(f"ERROR: credentials.json not found at {self.creds_path}")
-            self.client = None
-        else:
-            os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = str(self.creds_path)
-            self.client = BetaAnalyticsDataClient()
+        self.client = None
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        if eager:
+            self.init_client()
+
+    def init_client(self):
+        """Builds the GA4 client once. The gRPC channel is then reused by every request."""
+        with self._init_lock:
+            if self._initialized:
+                return self.client
+            if not self.creds_path.exists():
+                # Crucial: Don't crash the whole app, but log it clearly
+                print(f"ERROR: credentials.json not found at {self.creds_path}")
+            else:
+                try:
+                    # Imported here so the google stack isn't loaded until the client is needed
+                    from google.analytics.data_v1beta import BetaAnalyticsDataClient
+                    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = str(self.creds_path)
+                    self.client = BetaAnalyticsDataClient()
+                except Exception as e:
+                    print(f"❌ Failed to initialize Analytics Client: {e}")
+                    self.client = None
+            self._initialized = True
+            return self.client
+
+    def warm_connection(self, deadline=None):
+        """Opens the gRPC channel and fetches the auth token with a cheap metadata call.
+        Property 0 returns the metadata shared by all properties, so no propertyId is needed."""
+        if not self.init_client():
+            return False
+        timeout = deadline.timeout(self.TIMEOUT) if deadline else self.TIMEOUT
+        self.client.get_metadata(name="properties/0/metadata", timeout=timeout)
+        return True
 
     ALLOWED_METRICS = ["activeUsers", "sessions", "screenPageViews", "eventCount", "newUsers", "bounceRate"]
     ALLOWED_DIMENSIONS = ["date", "pagePath", "country", "city", "deviceCategory", "sessionSource"]
+    SAFE_METRICS = ["activeUsers", "screenPageViews"]
+    TIMEOUT = 30.0  # Per-call cap for runReport; shortened further by the request deadline
 
     def validate_plan(self, plan: dict):
         """Sanitize the LLM output before it hits the Google API."""
@@ -36,7 +63,7 @@ class AnalyticsAgent:
         plan["dimensions"] = validated_dimensions
         return plan
     
-    def run(self, property_id: str, reporting_plan: dict):
+    def run(self, property_id: str, reporting_plan: dict, deadline=None):
         # --- TIER 3 HOOK: FUSION VERIFICATION ---
         # --- TIER 3 HOOK: FUSION VERIFICATION ---
         if property_id == "TEST":
@@ -62,6 +89,10 @@ class AnalyticsAgent:
         Executes the query based on a plan generated by the LLM.
         """
         try:
+            from google.analytics.data_v1beta.types import (
+                DateRange, Dimension, Metric, RunReportRequest, FilterExpression, Filter
+            )
+
             # 1. Build the Request
             request = RunReportRequest(
                 property=f"properties/{property_id}",
@@ -83,21 +114,26 @@ class AnalyticsAgent:
                 )
 
             # 3. Execute
+            self.init_client()
             if not self.client:
                 return "Analytics Client not initialized. Check credentials.json."
             
-            response = self.client.run_report(request)
+            timeout = deadline.timeout(self.TIMEOUT) if deadline else self.TIMEOUT
+            response = self.client.run_report(request, timeout=timeout)
             return self._process_response(response)
 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             error_str = str(e).lower()
             
             # --- ROBUSTNESS UPGRADE: Smart Retry ---
-            # If GA4 complains about metrics, force a fallback to safe basics
+            # If GA4 complains about metrics, force a fallback to safe basics (once, and only if budget remains)
             if "metric" in error_str and ("not supported" in error_str or "invalid" in error_str):
-                print("⚠️ Invalid metric detected by GA4. Retrying with safe defaults...")
-                reporting_plan["metrics"] = ["activeUsers", "screenPageViews"]
-                return self.run(property_id, reporting_plan)
+                if reporting_plan.get("metrics") != self.SAFE_METRICS and not (deadline and deadline.expired()):
+                    print("⚠️ Invalid metric detected by GA4. Retrying with safe defaults...")
+                    reporting_plan["metrics"] = list(self.SAFE_METRICS)
+                    return self.run(property_id, reporting_plan, deadline)
             # ---------------------------------------
             
             return {"error": f"GA4 API Error: {str(e)}"}
@@ -1,14 +1,17 @@
 import os
-import pandas as pd
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
+import queue
+import threading
 from dotenv import load_dotenv
 from pathlib import Path
+from utils.deadline import DeadlineExceeded
 
 load_dotenv()
 
 class SEOAgent:
-    def __init__(self):
+    TIMEOUT = 20.0  # Per-call socket timeout for Sheets; shortened further by the request deadline
+    POOL_SIZE = 8  # Idle keep-alive transports kept between requests
+
+    def __init__(self, eager: bool = True):
         # 1. IDENTIFY THE SPREADSHEET ID (Prioritize .env, fallback to hardcoded)
         self.spreadsheet_id = os.getenv(
             "SEO_SPREADSHEET_ID", 
@@ -19,7 +22,22 @@ class SEOAgent:
         base_dir = Path(__file__).resolve().parent.parent
         self.creds_path = base_dir / "credentials.json"
         
-        self.service = self._get_sheets_service()
+        self.creds = None
+        self.service = None
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        # Keep-alive transports reused across requests (httplib2 is not thread-safe, so one per call)
+        self._http_pool = queue.Queue(maxsize=self.POOL_SIZE)
+        if eager:
+            self.init_service()
+
+    def init_service(self):
+        """Builds the Sheets service once; safe to call from several threads."""
+        with self._init_lock:
+            if not self._initialized:
+                self.service = self._get_sheets_service()
+                self._initialized = True
+            return self.service
 
     def _get_sheets_service(self):
         """Authenticates with Google Sheets API using Service Account."""
@@ -28,38 +46,98 @@ class SEOAgent:
             return None
         
         try:
+            # Imported here so the google stack isn't loaded until the service is needed
+            from googleapiclient.discovery import build
+            from google.oauth2 import service_account
+
             scopes = ['https://www.googleapis.com/auth/spreadsheets.readonly']
-            creds = service_account.Credentials.from_service_account_file(
+            self.creds = service_account.Credentials.from_service_account_file(
                 str(self.creds_path), scopes=scopes
             )
-            return build('sheets', 'v4', credentials=creds)
+            # Use the discovery document bundled with google-api-python-client instead of fetching it
+            return build('sheets', 'v4', credentials=self.creds, static_discovery=True, cache_discovery=False)
         except Exception as e:
             print(f"❌ Failed to initialize Sheets Service: {e}")
             return None
 
-    def find_best_tab(self):
+    def _checkout_http(self, timeout):
+        """Takes a pooled transport (or opens a new one) and applies this call's timeout."""
+        import httplib2
+        from google_auth_httplib2 import AuthorizedHttp
+
+        try:
+            authed = self._http_pool.get_nowait()
+        except queue.Empty:
+            authed = AuthorizedHttp(self.creds, http=httplib2.Http(timeout=timeout))
+
+        # Already-open keep-alive sockets keep their old timeout unless we update them too
+        authed.http.timeout = timeout
+        for conn in authed.http.connections.values():
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+        return authed
+
+    def _execute(self, request, deadline=None):
+        timeout = deadline.timeout(self.TIMEOUT) if deadline else self.TIMEOUT
+        authed = self._checkout_http(timeout)
+        try:
+            result = request.execute(http=authed)
+        except Exception:
+            # A timed-out read can leave a half-consumed response on the socket; never reuse it
+            self._close_http(authed)
+            raise
+
+        try:
+            self._http_pool.put_nowait(authed)
+        except queue.Full:
+            self._close_http(authed)
+        return result
+
+    @staticmethod
+    def _close_http(authed):
+        for conn in authed.http.connections.values():
+            conn.close()
+
+    def warm_connection(self, deadline=None):
+        """Fetches the auth token and leaves an open connection in the pool.
+        Unlike find_best_tab, errors are raised so warmup can report them."""
+        if not self.init_service():
+            return False
+        self._execute(self.service.spreadsheets().get(
+            spreadsheetId=self.spreadsheet_id, fields="spreadsheetId"
+        ), deadline)
+        return True
+
+    def find_best_tab(self, deadline=None):
         """Discovers all tab names in the spreadsheet."""
+        self.init_service()
         if not self.service:
             return ["Internal"] # Minimum fallback guess
             
         try:
-            spreadsheet = self.service.spreadsheets().get(
+            spreadsheet = self._execute(self.service.spreadsheets().get(
                 spreadsheetId=self.spreadsheet_id
-            ).execute()
+            ), deadline)
             return [s['properties']['title'] for s in spreadsheet.get('sheets', [])]
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Error fetching sheet metadata: {e}")
             return []
 
-    def get_data(self, tab_name):
+    def get_data(self, tab_name, deadline=None):
+        import pandas as pd
+
+        self.init_service()
         if not self.service:
             return "Error: Sheets Service not initialized."
 
         try:
-            result = self.service.spreadsheets().values().get(
+            result = self._execute(self.service.spreadsheets().values().get(
                 spreadsheetId=self.spreadsheet_id,
                 range=f"'{tab_name}'!A1:Z1000"
-            ).execute()
+            ), deadline)
             
             values = result.get('values', [])
             if not values:
@@ -94,5 +172,7 @@ class SEOAgent:
             # Final cleanup
             df = df.dropna(how='all').dropna(axis=1, how='all')
             return df
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             return f"Error fetching tab '{tab_name}': {str(e)}"
\ No newline at end of file
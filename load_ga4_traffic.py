@@ -0,0 +1,233 @@
+"""
+High-volume synthetic traffic for GA4, built on seed_ga4_data.py.
+
+Sends page_view events through the Measurement Protocol using a pooled async HTTP
+client, packing up to 25 events (GA4's per-request limit) for one user per POST.
+
+Examples:
+    # 2,000 users, pages weighted like a Screaming Frog export, spread over ~3 days
+    python load_ga4_traffic.py --users 2000 --crawl-export internal_all.csv --days 2.9
+
+    # Offline run against a built-in stand-in endpoint (nothing leaves the machine)
+    python load_ga4_traffic.py --users 500 --local-sink 8099
+
+Note: GA4 only accepts Measurement Protocol timestamps up to 72 hours in the past,
+so the default --days 2.9 stays just inside that window; larger spreads are partly
+dropped by Google (fine for a local sink).
+"""
+import argparse
+import asyncio
+import csv
+import random
+import re
+import time
+
+import httpx
+
+from seed_ga4_data import URL, build_payload
+
+MAX_EVENTS_PER_REQUEST = 25  # Measurement Protocol hard limit
+DEFAULT_DAYS = 2.9  # Safely under GA4's 72h backdating limit
+DEFAULT_PAGES = ["/home", "/pricing", "/blog/seo-tips", "/contact"]
+
+
+# --- WORKLOAD ---
+
+def load_page_distribution(crawl_export: str = None, weight_column: str = None):
+    """Returns (paths, weights). Pages come from an HTML/200 crawl export when given."""
+    if not crawl_export:
+        return DEFAULT_PAGES, [1.0] * len(DEFAULT_PAGES)
+
+    paths, weights = [], []
+    with open(crawl_export, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            # HTML pages that actually resolve (the fusion path also keeps only HTML)
+            # A missing column means "don't filter"; a short row (None values) is treated as empty
+            if "html" not in (row.get("Content Type", "html") or "").lower():
+                continue
+            if (row.get("Status Code", "200") or "").strip() not in ("200", ""):
+                continue
+
+            url = row.get("Address") or row.get("URL") or ""
+            path = re.sub(r"^https?://[^/]+", "", url).split("?")[0].rstrip("/") or "/"
+            try:
+                weight = float(row.get(weight_column, 1) or 1) if weight_column else 1.0
+            except ValueError:
+                weight = 1.0
+            paths.append(path)
+            weights.append(max(weight, 0.1))  # Keep orphan pages reachable
+
+    if not paths:
+        raise SystemExit(f"No HTML pages with status 200 found in {crawl_export}")
+    return paths, weights
+
+
+def generate_batches(args, paths, weights):
+    """Yields (client_id, events, timestamp_micros) batches of at most 25 events per user."""
+    now = time.time()
+    for _ in range(args.users):
+        client_id = f"{random.randint(10**8, 10**9 - 1)}.{int(now)}"
+
+        events = []
+        for _ in range(random.randint(1, args.sessions_per_user)):
+            session_id = str(random.randint(10**9, 10**10 - 1))
+            session_start = now - random.uniform(0, args.days * 24 * 60 * 60)
+            for i, path in enumerate(random.choices(paths, weights=weights, k=random.randint(1, args.pages_per_session))):
+                events.append({
+                    "name": "page_view",
+                    # Event-level timestamp so one batch can span several sessions/days (never in the future)
+                    "timestamp_micros": int(min(session_start + i * random.uniform(10, 120), now) * 1_000_000),
+                    "params": {
+                        "page_location": f"https://{args.domain}{path}",
+                        "page_title": f"Page {path}",
+                        "session_id": session_id,
+                        "engagement_time_msec": random.randint(1_000, 60_000),
+                    }
+                })
+
+        events.sort(key=lambda e: e["timestamp_micros"])
+        for i in range(0, len(events), args.batch_size):
+            chunk = events[i:i + args.batch_size]
+            yield client_id, chunk, chunk[0]["timestamp_micros"]
+
+
+# --- SENDING ---
+
+class RateLimiter:
+    """Spaces request starts evenly so we never exceed `rate` requests/second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def worker(client, endpoint, queue, limiter, stats):
+    while True:
+        batch = await queue.get()
+        if batch is None:
+            return
+        client_id, events, timestamp_micros = batch
+        await limiter.wait()
+        try:
+            response = await client.post(endpoint, json=build_payload(client_id, events, timestamp_micros))
+            if response.status_code in (200, 204):
+                stats["requests"] += 1
+                stats["events"] += len(events)
+            else:
+                stats["failed"] += 1
+                print(f"❌ Failed: {response.status_code} {response.text[:200]}")
+        except Exception as e:
+            # Count everything (e.g. httpx.InvalidURL isn't an HTTPError) so a worker never dies
+            # silently and leaves the producer blocked on the bounded queue
+            stats["failed"] += 1
+            print(f"❌ Failed: {type(e).__name__}: {e}")
+
+
+async def run_load(args):
+    paths, weights = load_page_distribution(args.crawl_export, args.weight_column)
+    endpoint = args.endpoint or URL
+    print(f"🚀 {args.users} users over {len(paths)} pages -> {endpoint.split('?')[0]}")
+
+    stats = {"requests": 0, "events": 0, "failed": 0}
+    limiter = RateLimiter(args.rate)
+    # Bounded queue keeps memory flat for large workloads
+    queue = asyncio.Queue(maxsize=args.concurrency * 4)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    start = time.perf_counter()
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        workers = [
+            asyncio.create_task(worker(client, endpoint, queue, limiter, stats))
+            for _ in range(args.concurrency)
+        ]
+        for batch in generate_batches(args, paths, weights):
+            await queue.put(batch)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"✅ Sent {stats['events']} events in {stats['requests']} requests "
+        f"({stats['failed']} failed) in {elapsed:.1f}s -> {stats['events'] / elapsed:.0f} events/s"
+    )
+    return stats
+
+
+# --- LOCAL STAND-IN ---
+
+async def _sink_handler(reader, writer):
+    """Minimal keep-alive HTTP endpoint that accepts any POST with 204, like /mp/collect."""
+    try:
+        while True:
+            headers = await reader.readuntil(b"\r\n\r\n")
+            length = re.search(rb"content-length:\s*(\d+)", headers, re.IGNORECASE)
+            if length:
+                await reader.readexactly(int(length.group(1)))
+            writer.write(b"HTTP/1.1 204 No Content\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def main(args):
+    if args.local_sink:
+        server = await asyncio.start_server(_sink_handler, "127.0.0.1", args.local_sink)
+        args.endpoint = f"http://127.0.0.1:{args.local_sink}/mp/collect"
+        async with server:
+            await run_load(args)
+    else:
+        await run_load(args)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Async GA4 Measurement Protocol load generator")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--sessions-per-user", type=int, default=3, help="Max sessions per user")
+    parser.add_argument("--pages-per-session", type=int, default=5, help="Max page views per session")
+    parser.add_argument("--days", type=float, default=DEFAULT_DAYS, help="Spread events over the last N days")
+    parser.add_argument("--crawl-export", help="Screaming Frog CSV export to draw page paths from")
+    parser.add_argument("--weight-column", help="Crawl column used as page weight (e.g. 'Unique Inlinks')")
+    parser.add_argument("--domain", default="example.com")
+    parser.add_argument("--batch-size", type=int, default=MAX_EVENTS_PER_REQUEST)
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent in-flight requests")
+    parser.add_argument("--rate", type=float, default=50, help="Max requests per second (0 = unlimited)")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--endpoint", help="Override the collect URL (e.g. a local stand-in)")
+    parser.add_argument("--local-sink", type=int, metavar="PORT", help="Start a built-in stand-in endpoint and target it")
+    args = parser.parse_args(argv)
+
+    if args.users < 1:
+        parser.error("--users must be at least 1")
+    if args.sessions_per_user < 1:
+        parser.error("--sessions-per-user must be at least 1")
+    if args.pages_per_session < 1:
+        parser.error("--pages-per-session must be at least 1")
+    if args.days < 0:
+        parser.error("--days must not be negative")
+    if args.rate < 0:
+        parser.error("--rate must not be negative (0 = unlimited)")
+    if args.timeout <= 0:
+        parser.error("--timeout must be positive")
+    if not 1 <= args.batch_size <= MAX_EVENTS_PER_REQUEST:
+        parser.error(f"--batch-size must be between 1 and {MAX_EVENTS_PER_REQUEST}")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -1,13 +1,43 @@
+import os
+import time
+
+_import_start = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from pydantic import BaseModel
 from orchestrator import Orchestrator
 
-app = FastAPI()
-orchestrator = Orchestrator()
+# FAST_START=true: skip eager client construction so the worker can serve as soon as it's imported
+FAST_START = os.getenv("FAST_START", "false").lower() in ("1", "true", "yes")
+
+orchestrator = Orchestrator(fast_start=FAST_START)
+
+STARTUP_SECONDS = round(time.perf_counter() - _import_start, 3)
+print(f"⏱️ App ready in {STARTUP_SECONDS}s (fast start: {FAST_START})")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Clients are built off the request path; the first query waits only if warmup hasn't finished
+    if FAST_START:
+        orchestrator.start_background_warmup()
+    yield
+
+app = FastAPI(lifespan=lifespan)
+
+@app.get("/health")
+async def health():
+    return {
+        "ready": orchestrator.ready,
+        "fast_start": FAST_START,
+        "startup_seconds": STARTUP_SECONDS,
+        "warmup_seconds": orchestrator.startup_timings,
+    }
 
 class QueryRequest(BaseModel):
     query: str
     propertyId: str = None # Required for GA4
+    deadlineSeconds: float = None # Optional: shorter budget than QUERY_DEADLINE_SECONDS for this request
 
 @app.post("/query")
 async def query_endpoint(request: QueryRequest):
@@ -16,7 +46,7 @@ async def query_endpoint(request: QueryRequest):
         return {"response": "Please provide a query."}
         
     try:
-        response = await orchestrator.handle_query(request.query, request.propertyId)
+        response = await orchestrator.handle_query(request.query, request.propertyId, request.deadlineSeconds)
         return {"response": response}
     except Exception as e:
         # Prevent the server from crashing; return a clean error
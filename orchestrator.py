@@ -2,26 +2,98 @@ from utils.llm_client import LLMClient
 from utils.prompts import ANALYTICS_SYSTEM_PROMPT, ROUTING_SYSTEM_PROMPT, SEO_FILTER_PROMPT
 from agents.analytics_agent import AnalyticsAgent
 from agents.seo_agent import SEOAgent
+from utils.deadline import Deadline, DeadlineExceeded
+from openai import APIError
 import os
-import pandas as pd
+import time
+import threading
+import importlib
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class Orchestrator:
-    def __init__(self):
+    def __init__(self, fast_start: bool = False):
         api_key = os.getenv("LITELLM_API_KEY") 
         self.llm = LLMClient(api_key=api_key)
-        self.analytics_agent = AnalyticsAgent()
-        self.seo_agent = SEOAgent() # Initialize once
+        # In fast-start mode the Google clients are built by warmup() instead of here
+        self.analytics_agent = AnalyticsAgent(eager=False)
+        self.seo_agent = SEOAgent(eager=False) # Initialize once
+
+        self.ready = False
+        self.startup_timings = {}
+        self._warmup_lock = threading.Lock()
+        if not fast_start:
+            # Eager mode: build clients at import like before, but make no network calls
+            self.warmup(warm_connections=False)
+
+    def warmup(self, deadline=None, warm_connections=True):
+        """Imports pandas, builds the GA4/Sheets clients and (optionally) opens their connections.
+
+        Runs once. A failing step is recorded in startup_timings and skipped; the agents
+        then report their own missing client, so e.g. SEO queries still work without GA4.
+        """
+        with self._warmup_lock:
+            if self.ready:
+                return self.startup_timings
+
+            timings = {}
+            start = time.perf_counter()
+
+            def step(name, func, *args):
+                began = time.perf_counter()
+                try:
+                    if func(*args) is False:
+                        timings[name] = "skipped: client not available"
+                        return
+                    timings[name] = round(time.perf_counter() - began, 3)
+                except Exception as e:
+                    timings[name] = f"failed: {e}"
+                    print(f"⚠️ Warmup step '{name}' failed: {e}")
+
+            step("pandas_import", importlib.import_module, "pandas")  # Pay the import cost here, not in the first query
+            step("analytics_client", self.analytics_agent.init_client)
+            step("sheets_service", self.seo_agent.init_service)
+
+            if warm_connections:
+                # Fetch the auth tokens and leave open connections behind for the first queries
+                step("analytics_warm_call", self.analytics_agent.warm_connection, deadline)
+                step("sheets_warm_call", self.seo_agent.warm_connection, deadline)
+
+            timings["total"] = round(time.perf_counter() - start, 3)
+            self.startup_timings = timings
+            self.ready = True
+            print(f"🔥 Warmup complete: {self.startup_timings}")
+            return self.startup_timings
+
+    def start_background_warmup(self):
+        threading.Thread(target=self.warmup, name="orchestrator-warmup", daemon=True).start()
+
+    async def handle_query(self, query: str, property_id: str = None, deadline_seconds: float = None):
+        # Every phase shares one budget; whatever was gathered before it ran out is returned
+        deadline = Deadline(deadline_seconds)
+        progress = {"stage": "routing", "data": None}
+        try:
+            return await self._handle_query(query, property_id, deadline, progress)
+        except DeadlineExceeded:
+            return self._partial_answer(deadline, progress)
+
+    async def _handle_query(self, query, property_id, deadline, progress):
+        # First request in fast-start mode waits for (or triggers) the background warmup
+        if not self.ready:
+            progress["stage"] = "warming up clients"
+            await deadline.run(self.warmup, deadline)
+            progress["stage"] = "routing"
+        import pandas as pd  # Already loaded by warmup()
 
-    async def handle_query(self, query: str, property_id: str = None):
         # --- PHASE 1: INTENT ROUTING & TAB SELECTION ---
-        available_tabs = self.seo_agent.find_best_tab()
+        available_tabs = await deadline.run(self.seo_agent.find_best_tab, deadline)
         
-        routing_response = self.llm.get_structured_completion(
+        routing_response = await deadline.run(
+            self.llm.get_structured_completion,
             ROUTING_SYSTEM_PROMPT.format(tab_names=available_tabs),
-            query
+            query,
+            deadline=deadline
         )
         
         intent = routing_response.get("intent")
@@ -35,14 +107,19 @@ class Orchestrator:
         if intent == "SEO":
             if not target_tab: target_tab = "Internal" 
             
-            df = self.seo_agent.get_data(target_tab)
+            progress["stage"] = f"fetching SEO tab '{target_tab}'"
+            df = await deadline.run(self.seo_agent.get_data, target_tab, deadline)
             if isinstance(df, str) or df.empty:
                 return f"Could not retrieve data from tab '{target_tab}'."
 
             columns = list(df.columns)
-            filter_plan = self.llm.get_structured_completion(
+            progress["stage"] = "planning the SEO filter"
+            progress["data"] = f"Tab '{target_tab}' has {len(df)} rows. Columns: {columns}"
+            filter_plan = await deadline.run(
+                self.llm.get_structured_completion,
                 SEO_FILTER_PROMPT,
-                f"Columns: {columns}\nUser Query: {query}"
+                f"Columns: {columns}\nUser Query: {query}",
+                deadline=deadline
             )
             
             query_str = filter_plan.get("pandas_query", "")
@@ -88,8 +165,10 @@ class Orchestrator:
                     "note": "Use the 'statistics' field for counts and percentages. Do not count the sample rows manually."
                 }
                 
-                return self._summarize_results(query, data_context)
+                return await self._summarize_results(query, data_context, deadline, progress)
                 
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 return f"I found the data in '{target_tab}', but couldn't filter it. Error: {e}"
 
@@ -106,7 +185,8 @@ class Orchestrator:
                 "dimensions": ["pagePath"],
                 "days_ago": 30 
             }
-            ga4_data = self.analytics_agent.run(property_id, ga4_plan)
+            progress["stage"] = "fetching GA4 data for fusion"
+            ga4_data = await deadline.run(self.analytics_agent.run, property_id, ga4_plan, deadline)
             
             if isinstance(ga4_data, str): return f"GA4 Failed: {ga4_data}"
             
@@ -119,7 +199,9 @@ class Orchestrator:
             target_tab = "internal_all"
             print(f"🔒 FUSION OVERRIDE: Forcing data fetch from '{target_tab}'")
             
-            df_seo = self.seo_agent.get_data(target_tab)
+            progress["stage"] = f"fetching SEO tab '{target_tab}' for fusion"
+            progress["data"] = df_ga4.head(10).to_dict(orient="records")
+            df_seo = await deadline.run(self.seo_agent.get_data, target_tab, deadline)
             
             if isinstance(df_seo, str) or df_seo.empty:
                 return f"Got GA4 data, but failed to fetch SEO data from '{target_tab}'."
@@ -195,8 +277,10 @@ class Orchestrator:
                     for k, v in row.items():
                         if isinstance(v, str) and len(v) > 100: row[k] = v[:100] + "..."
 
-                return self._summarize_results(query, final_data)
+                return await self._summarize_results(query, final_data, deadline, progress)
                 
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 return f"Fusion failed during data merging. Error: {e}"
             
@@ -205,16 +289,24 @@ class Orchestrator:
             if not property_id:
                 return "This looks like an analytics request, but I need a propertyId to proceed."
                 
-            reporting_plan = self.llm.get_structured_completion(ANALYTICS_SYSTEM_PROMPT, query)
+            progress["stage"] = "planning the GA4 report"
+            reporting_plan = await deadline.run(
+                self.llm.get_structured_completion, ANALYTICS_SYSTEM_PROMPT, query, deadline=deadline
+            )
             if "error" in reporting_plan: return reporting_plan["error"]
             
             validated_plan = self.analytics_agent.validate_plan(reporting_plan)
-            raw_data = self.analytics_agent.run(property_id, validated_plan)
-            return self._summarize_results(query, raw_data)
+            progress["stage"] = "fetching GA4 data"
+            raw_data = await deadline.run(self.analytics_agent.run, property_id, validated_plan, deadline)
+            return await self._summarize_results(query, raw_data, deadline, progress)
 
         return "I'm not sure how to handle that. Try asking about 'page views' (GA4) or 'broken links' (SEO)."
 
-    def _summarize_results(self, original_query, data):
+    async def _summarize_results(self, original_query, data, deadline=None, progress=None):
+        if progress is not None:
+            progress["stage"] = "summarizing"
+            progress["data"] = data
+
         is_empty = "No data found" in str(data) or not data
         
         system_context = "You are a helpful analytics assistant."
@@ -227,11 +319,28 @@ class Orchestrator:
         
         Provide a concise, professional summary.
         """
-        return self.client_summarize(system_context, summary_prompt)
+        if deadline is None:
+            return self.client_summarize(system_context, summary_prompt)
+        try:
+            return await deadline.run(self.client_summarize, system_context, summary_prompt, deadline)
+        except APIError as e:
+            # The data is already fetched; hand it back unsummarized rather than losing it
+            print(f"❌ Summary failed after retries: {e}")
+            return self._partial_answer(deadline, progress, reason="the LLM could not be reached")
 
-    def client_summarize(self, system, user):
-        response = self.llm.client.chat.completions.create(
-            model=self.llm.model,
-            messages=[{"role": "system", "content": system}, {"role": "user", "content": user}]
-        )
-        return response.choices[0].message.content
\ No newline at end of file
+    def client_summarize(self, system, user, deadline=None):
+        return self.llm.get_completion(system, user, deadline=deadline)
+
+    def _partial_answer(self, deadline, progress, reason=None):
+        """Best-effort reply when a phase can't finish: report where we stopped and any data already fetched."""
+        if reason is None:
+            reason = f"I ran out of time ({deadline.budget:g}s budget)"
+            print(f"⏱️ Deadline of {deadline.budget:g}s exceeded while {progress['stage']}")
+        else:
+            reason = f"I stopped because {reason}"
+        answer = f"{reason} while {progress['stage']}."
+        if progress["data"]:
+            data = str(progress["data"])
+            if len(data) > 2000: data = data[:2000] + "..."
+            answer += f" Here is the raw data retrieved so far, without a summary:\n{data}"
+        return answer
\ No newline at end of file
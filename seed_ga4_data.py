@@ -9,18 +9,16 @@ API_SECRET = "70Bkdq-3R9K-f9HobOCEpA"          # From Measurement Protocol API S
 # The endpoint for sending events
 URL = f"https://www.google-analytics.com/mp/collect?measurement_id={MEASUREMENT_ID}&api_secret={API_SECRET}"
 
-def send_backdated_event(client_id, event_name, params, timestamp_micros):
-    payload = {
+def build_payload(client_id, events, timestamp_micros):
+    return {
         "client_id": client_id,
         "timestamp_micros": timestamp_micros, # This creates the "Backdated" effect
         "non_personalized_ads": False,
-        "events": [
-            {
-                "name": event_name,
-                "params": params
-            }
-        ]
+        "events": events
     }
+
+def send_backdated_event(client_id, event_name, params, timestamp_micros):
+    payload = build_payload(client_id, [{"name": event_name, "params": params}], timestamp_micros)
     
     # Send the POST request
     response = requests.post(URL, json=payload)
@@ -30,26 +28,28 @@ def send_backdated_event(client_id, event_name, params, timestamp_micros):
         print(f"❌ Failed: {response.status_code} {response.text}")
 
 # --- SIMULATION ---
-# Let's backdate data to 7 days ago
-days_ago = 7
-seconds_ago = days_ago * 24 * 60 * 60
-# GA4 expects microseconds (millionths of a second)
-past_timestamp = int((time.time() - seconds_ago) * 1_000_000)
+# (For larger volumes see load_ga4_traffic.py, which reuses this config)
+if __name__ == "__main__":
+    # Let's backdate data to 7 days ago
+    days_ago = 7
+    seconds_ago = days_ago * 24 * 60 * 60
+    # GA4 expects microseconds (millionths of a second)
+    past_timestamp = int((time.time() - seconds_ago) * 1_000_000)
 
-# Simulate 5 users visiting specific pages
-pages = ["/home", "/pricing", "/blog/seo-tips", "/contact"]
+    # Simulate 5 users visiting specific pages
+    pages = ["/home", "/pricing", "/blog/seo-tips", "/contact"]
 
-for i in range(5):
-    user_id = f"user_{random.randint(1000, 9999)}"
-    page = random.choice(pages)
+    for i in range(5):
+        user_id = f"user_{random.randint(1000, 9999)}"
+        page = random.choice(pages)
     
-    send_backdated_event(
-        client_id=user_id,
-        event_name="page_view",
-        params={
-            "page_location": f"https://example.com{page}",
-            "page_title": f"Page {page}",
-            "session_id": "100" # Required to show up in "Traffic Acquisition"
-        },
-        timestamp_micros=past_timestamp
-    )
\ No newline at end of file
+        send_backdated_event(
+            client_id=user_id,
+            event_name="page_view",
+            params={
+                "page_location": f"https://example.com{page}",
+                "page_title": f"Page {page}",
+                "session_id": "100" # Required to show up in "Traffic Acquisition"
+            },
+            timestamp_micros=past_timestamp
+        )
\ No newline at end of file
@@ -0,0 +1,78 @@
+import os
+import time
+import asyncio
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _load_max_deadline(default: float = 45.0):
+    """Parses QUERY_DEADLINE_SECONDS once at import; a bad value falls back to the default."""
+    raw = os.getenv("QUERY_DEADLINE_SECONDS")
+    if raw is None:
+        return default
+    try:
+        seconds = float(raw)
+    except ValueError:
+        seconds = 0
+    if not 0 < seconds < float("inf"):
+        print(f"⚠️ Invalid QUERY_DEADLINE_SECONDS={raw!r}, using {default:g}s")
+        return default
+    return seconds
+
+
+# End-to-end budget for a single /query. Per-request overrides may shorten it, never extend it.
+MAX_DEADLINE_SECONDS = _load_max_deadline()
+
+# Below this much remaining budget we don't bother starting a new network call
+MIN_CALL_SECONDS = 1.0
+
+# Smallest per-request override we honour; anything shorter couldn't finish a single phase
+MIN_DEADLINE_SECONDS = min(5.0, MAX_DEADLINE_SECONDS)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a phase can't start or finish within the request budget."""
+
+
+class Deadline:
+    """Wall-clock budget shared by every phase of one request."""
+
+    def __init__(self, seconds: float = None):
+        # Clamp caller overrides so a huge deadlineSeconds can't switch the bound off,
+        # and a tiny one can't fail the request before any work is attempted
+        if not seconds or not 0 < seconds < MAX_DEADLINE_SECONDS:
+            seconds = MAX_DEADLINE_SECONDS
+        seconds = max(seconds, MIN_DEADLINE_SECONDS)
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() < MIN_CALL_SECONDS
+
+    def timeout(self, cap: float):
+        """Per-call timeout: the phase's own cap, shortened to what's left of the budget."""
+        remaining = self.remaining()
+        if remaining < MIN_CALL_SECONDS:
+            raise DeadlineExceeded(f"Request budget of {self.budget:g}s exhausted.")
+        return min(cap, remaining)
+
+    def can_wait(self, seconds: float):
+        """True if sleeping `seconds` (e.g. a retry backoff) still leaves room for another call."""
+        return self.remaining() - seconds >= MIN_CALL_SECONDS
+
+    async def run(self, func, *args, **kwargs):
+        """Runs a blocking phase in a worker thread and stops waiting for it once the budget runs out.
+
+        The thread itself is not cancelled: it keeps its executor slot until the call
+        returns. That is bounded only because every network call inside a phase takes
+        its timeout from this deadline, so new phases must do the same.
+        """
+        timeout = self.timeout(self.budget)
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(func, *args, **kwargs), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"Request budget of {self.budget:g}s exhausted.")
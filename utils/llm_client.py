@@ -1,43 +1,85 @@
 import time
 import json
 from openai import OpenAI, APIError, APITimeoutError, APIConnectionError
+from utils.deadline import DeadlineExceeded
 
 class LLMClient:
+    TIMEOUT = 60.0  # Increased to 60s to give the proxy plenty of time
+    # Same statuses the OpenAI SDK retries on its own (plus any 5xx)
+    RETRYABLE_STATUS_CODES = (408, 409, 429)
+
     def __init__(self, api_key: str, base_url: str = "http://3.110.18.218"):
         self.client = OpenAI(
             api_key=api_key, 
             base_url=base_url,
-            timeout=60.0  # Increased to 60s to give the proxy plenty of time
+            timeout=self.TIMEOUT
         )
         self.model = "gemini-2.5-flash"
 
-    def get_structured_completion(self, system_prompt: str, user_query: str, max_retries: int = 3):
+    def for_deadline(self, deadline=None):
+        """Client whose timeout is shortened to the remaining request budget.
+        The SDK's own retries are disabled; _create_with_retries retries the same errors
+        (timeouts, connection errors, 408/409/429/5xx) but only while budget remains."""
+        if deadline is None:
+            return self.client
+        return self.client.with_options(timeout=deadline.timeout(self.TIMEOUT), max_retries=0)
+
+    def _is_retryable(self, error):
+        if isinstance(error, (APITimeoutError, APIConnectionError)):
+            return True
+        status_code = getattr(error, "status_code", None)
+        return status_code is not None and (status_code in self.RETRYABLE_STATUS_CODES or status_code >= 500)
+
+    def _create_with_retries(self, messages, max_retries: int = 3, deadline=None, **kwargs):
+        """Calls the chat API with exponential backoff. Raises the last APIError once retries run out,
+        or DeadlineExceeded if the next backoff wouldn't fit in the request budget."""
         base_delay = 2
         for attempt in range(max_retries):
             try:
-                response = self.client.chat.completions.create(
+                return self.for_deadline(deadline).chat.completions.create(
                     model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_query}
-                    ],
-                    response_format={"type": "json_object"}
+                    messages=messages,
+                    **kwargs
                 )
-                return json.loads(response.choices[0].message.content)
-            
-            except (APITimeoutError, APIConnectionError) as e:
-                wait_time = base_delay * (2 ** attempt)
-                print(f"⚠️ Connection/Timeout Error (Attempt {attempt+1}/{max_retries}). Retrying in {wait_time}s...")
-                time.sleep(wait_time)
-                
             except APIError as e:
-                # Safely check for status_code if it exists
-                status_code = getattr(e, "status_code", None)
-                if status_code == 429:
-                    wait_time = base_delay * (2 ** attempt)
+                if not self._is_retryable(e) or attempt == max_retries - 1:
+                    raise
+
+                wait_time = base_delay * (2 ** attempt)
+                if deadline is not None and not deadline.can_wait(wait_time):
+                    raise DeadlineExceeded(f"LLM call failed ({type(e).__name__}) and no budget is left to retry.")
+
+                if getattr(e, "status_code", None) == 429:
                     print(f"⏳ Rate limited. Retrying in {wait_time}s...")
-                    time.sleep(wait_time)
                 else:
-                    return {"error": f"API Error: {str(e)}"}
-        
-        return {"error": "Failed to reach the LLM proxy after multiple attempts. Please check your internet or proxy status."}
\ No newline at end of file
+                    print(f"⚠️ {type(e).__name__} (Attempt {attempt+1}/{max_retries}). Retrying in {wait_time}s...")
+                time.sleep(wait_time)
+
+    def get_structured_completion(self, system_prompt: str, user_query: str, max_retries: int = 3, deadline=None):
+        try:
+            response = self._create_with_retries(
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_query}
+                ],
+                max_retries,
+                deadline,
+                response_format={"type": "json_object"}
+            )
+            return json.loads(response.choices[0].message.content)
+        except APIError as e:
+            if self._is_retryable(e):
+                return {"error": "Failed to reach the LLM proxy after multiple attempts. Please check your internet or proxy status."}
+            return {"error": f"API Error: {str(e)}"}
+
+    def get_completion(self, system_prompt: str, user_prompt: str, max_retries: int = 3, deadline=None):
+        """Plain-text completion with the same budget-aware retries. Raises APIError on failure."""
+        response = self._create_with_retries(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_retries,
+            deadline
+        )
+        return response.choices[0].message.content